@@ -9,13 +9,14 @@ Generates realistic transport network data for the Shanghai → Rotterdam → Lo
 Seeds both SurrealDB (transport network) and Dragonfly (constraint cache).
 
 Usage:
-    julia scripts/seed_data.jl [--surrealdb-url URL] [--dragonfly-url URL]
+    julia scripts/seed_data.jl [--surrealdb-url URL] [--dragonfly-url URL] [--seed N] [--defer-indexes]
 """
 
 using HTTP
 using JSON3
 using Redis
 using ArgParse
+using Base64
 using Random
 
 # =============================================================================
@@ -97,6 +98,8 @@ const CARRIERS = [
          "safety" => 5, "unionized" => true, "wage" => 3500, "hours" => 40),
 ]
 
+const CARRIER_BY_CODE = Dict(c["code"] => c for c in CARRIERS)
+
 const CARBON_FACTORS = Dict(
     "MARITIME" => 0.015,
     "RAIL" => 0.025,
@@ -131,28 +134,23 @@ const ROUTES = [
 # EDGE GENERATION
 # =============================================================================
 
-function generate_edge(route::Dict, carrier::Dict)::Dict
-    mode = route["mode"]
-
-    # Base cost calculation (USD)
-    base_cost = if mode == "MARITIME"
-        route["km"] * 0.5 + rand() * 2000 + 1000
-    elseif mode == "RAIL"
-        route["km"] * 0.8 + rand() * 1000 + 500
-    elseif mode == "ROAD"
-        route["km"] * 1.2 + rand() * 300 + 200
-    else  # AIR
-        route["km"] * 3.0 + rand() * 3000 + 2000
-    end
+# Per-mode base cost model (USD): km * per_km + floor + U(0, 1) * spread
+const COST_MODEL = Dict(
+    "MARITIME" => (per_km=0.5, floor=1000, spread=2000),
+    "RAIL" => (per_km=0.8, floor=500, spread=1000),
+    "ROAD" => (per_km=1.2, floor=200, spread=300),
+    "AIR" => (per_km=3.0, floor=2000, spread=3000),
+)
 
-    variance = route["hours"] * 0.1
-    transit_hours = route["hours"] + (rand() * 2 - 1) * variance
+# Links are bare keys; the seeder resolves them to record ids server-side
+function generate_edge(route::Dict, carrier::Dict, base_cost::Float64, transit_hours::Float64)::Dict
+    mode = route["mode"]
 
     Dict(
         "code" => "$(route["from"])-$(route["to"])-$(mode[1])-$(carrier["code"])",
-        "from_node" => "transport_node:$(route["from"])",
-        "to_node" => "transport_node:$(route["to"])",
-        "carrier" => "carrier:$(carrier["code"])",
+        "from_node" => route["from"],
+        "to_node" => route["to"],
+        "carrier" => carrier["code"],
         "mode" => mode,
         "distance_km" => route["km"],
         "base_cost_usd" => round(base_cost, digits=2),
@@ -164,145 +162,211 @@ function generate_edge(route::Dict, carrier::Dict)::Dict
     )
 end
 
+# One edge per (route, carrier) pair, with all random draws batched up front
+function generate_edges(rng::AbstractRNG=Random.default_rng())
+    pairs = [(route, CARRIER_BY_CODE[carrier_code]) for route in ROUTES for carrier_code in route["carriers"]]
+    n = length(pairs)
+
+    km = Float64[route["km"] for (route, _) in pairs]
+    hours = Float64[route["hours"] for (route, _) in pairs]
+    model = [COST_MODEL[route["mode"]] for (route, _) in pairs]
+
+    base_cost = km .* getfield.(model, :per_km) .+ getfield.(model, :floor) .+
+                rand(rng, n) .* getfield.(model, :spread)
+    # Transit time varies within ±10% of the scheduled hours
+    transit_hours = hours .+ (rand(rng, n) .* 2 .- 1) .* hours .* 0.1
+
+    (generate_edge(route, carrier, base_cost[i], transit_hours[i])
+     for (i, (route, carrier)) in enumerate(pairs))
+end
+
 # =============================================================================
 # DATABASE SEEDING
 # =============================================================================
 
 struct SurrealDBSeeder
-    url::String
-    user::String
-    password::String
+    sql_url::HTTP.URI
+    headers::Vector{Pair{String, String}}
+    pool::HTTP.Pool
 end
 
-function query(seeder::SurrealDBSeeder, sql::String)
+function SurrealDBSeeder(url::String, user::String, password::String)
     headers = [
         "Content-Type" => "application/text",
         "Accept" => "application/json",
         "NS" => "veds",
         "DB" => "production",
+        "Authorization" => "Basic $(base64encode("$user:$password"))",
     ]
+    SurrealDBSeeder(HTTP.URI(rstrip(url, '/') * "/sql"), headers, HTTP.Pool(4))
+end
 
+# /sql answers 200 even when a statement fails, so every status is checked
+function execute(seeder::SurrealDBSeeder, body)
     resp = HTTP.post(
-        "$(seeder.url)/sql",
-        headers,
-        sql;
-        basic_authorization=(seeder.user, seeder.password),
+        seeder.sql_url,
+        seeder.headers,
+        body;
+        pool=seeder.pool,
         connect_timeout=30,
         readtimeout=30,
     )
 
-    JSON3.read(String(resp.body))
+    results = JSON3.read(resp.body)
+    failures = unique(string(get(r, :result, r)) for r in results if get(r, :status, "ERR") != "OK")
+    isempty(failures) || error("SurrealDB statement failed: " * join(failures, "; "))
+    results
 end
 
-function seed_countries!(seeder::SurrealDBSeeder)
-    println("Seeding countries...")
-    for (code, data) in COUNTRIES
-        sql = """
-        CREATE country:$code SET
-            code = '$code',
-            name = '$(data["name"])',
-            min_wage_cents_hourly = $(data["min_wage_cents"]),
-            max_weekly_hours = $(data["max_hours"]),
-            region = '$(data["region"])',
-            currency = 'USD';
-        """
-        query(seeder, sql)
+# Rows per POST, keeping request bodies bounded
+const BULK_CHUNK_SIZE = 500
+
+# Encoded bytes buffered before a streamed body chunk is sent
+const STREAM_FLUSH_BYTES = 64 * 1024
+
+# Streams `rows` into `sql`'s $rows binding, one transaction per BULK_CHUNK_SIZE rows
+function insert_rows(seeder::SurrealDBSeeder, sql::String, rows)
+    # Rows are pulled lazily by the body producer
+    remaining = Iterators.Stateful(rows)
+    while !isempty(remaining)
+        body = Channel{Vector{UInt8}}(1) do out
+            io = IOBuffer()
+            print(io, "BEGIN TRANSACTION;\nLET \$rows = [")
+            for (i, row) in enumerate(Iterators.take(remaining, BULK_CHUNK_SIZE))
+                i > 1 && print(io, ',')
+                JSON3.write(io, row)
+                if position(io) >= STREAM_FLUSH_BYTES
+                    put!(out, take!(io))
+                end
+            end
+            print(io, "];\n", sql, "\nCOMMIT TRANSACTION;")
+            put!(out, take!(io))
+        end
+        execute(seeder, body)
     end
-    println("  Created $(length(COUNTRIES)) countries")
+end
+
+# Per-table INSERT statements; only the bound $rows change
+const COUNTRY_INSERT = "INSERT INTO country \$rows RETURN NONE;"
+
+const PORT_INSERT = """
+    INSERT INTO port (
+        SELECT id, unlocode, name, type::thing('country', country) AS country,
+            location, timezone, port_type, modes, avg_dwell_hours
+        FROM \$rows
+    ) RETURN NONE;"""
+
+const CARRIER_INSERT = """
+    INSERT INTO carrier (
+        SELECT id, code, name, carrier_type, type::thing('country', country) AS country,
+            safety_rating, unionized, avg_wage_cents_hourly, avg_weekly_hours,
+            sanctioned, active
+        FROM \$rows
+    ) RETURN NONE;"""
+
+const TRANSPORT_NODE_INSERT = """
+    INSERT INTO transport_node (
+        SELECT id, code, type::thing('port', port) AS port, node_type, modes, active
+        FROM \$rows
+    ) RETURN NONE;"""
+
+const TRANSPORT_EDGE_INSERT = """
+    INSERT INTO transport_edge (
+        SELECT code,
+            type::thing('transport_node', from_node) AS from_node,
+            type::thing('transport_node', to_node) AS to_node,
+            type::thing('carrier', carrier) AS carrier,
+            mode, distance_km, base_cost_usd, cost_per_kg_usd, transit_hours,
+            carbon_kg_per_tonne_km, frequency, active
+        FROM \$rows
+    ) RETURN NONE;"""
+
+const CARGO_TYPE_INSERT = """
+    INSERT INTO cargo_type (
+        SELECT id, code, name, hazmat_class, temp_controlled, temp_min_c, temp_max_c
+        FROM \$rows
+    ) RETURN NONE;"""
+
+function seed_countries!(seeder::SurrealDBSeeder)
+    rows = [
+        Dict{String, Any}(
+            "id" => code,
+            "code" => code,
+            "name" => data["name"],
+            "min_wage_cents_hourly" => data["min_wage_cents"],
+            "max_weekly_hours" => data["max_hours"],
+            "region" => data["region"],
+            "currency" => "USD",
+        )
+        for (code, data) in COUNTRIES
+    ]
+    insert_rows(seeder, COUNTRY_INSERT, rows)
+    length(rows)
 end
 
 function seed_ports!(seeder::SurrealDBSeeder)
-    println("Seeding ports...")
-    for port in PORTS
-        modes_json = JSON3.write(port["modes"])
-        sql = """
-        CREATE port:$(port["unlocode"]) SET
-            unlocode = '$(port["unlocode"])',
-            name = '$(port["name"])',
-            country = country:$(port["country"]),
-            location = { type: 'Point', coordinates: [$(port["lon"]), $(port["lat"])] },
-            timezone = 'UTC',
-            port_type = '$(port["type"])',
-            modes = $modes_json,
-            avg_dwell_hours = $(port["dwell_hours"]);
-        """
-        query(seeder, sql)
-    end
-    println("  Created $(length(PORTS)) ports")
+    rows = [
+        Dict{String, Any}(
+            "id" => port["unlocode"],
+            "unlocode" => port["unlocode"],
+            "name" => port["name"],
+            "country" => port["country"],
+            "location" => Dict("type" => "Point", "coordinates" => [port["lon"], port["lat"]]),
+            "timezone" => "UTC",
+            "port_type" => port["type"],
+            "modes" => port["modes"],
+            "avg_dwell_hours" => port["dwell_hours"],
+        )
+        for port in PORTS
+    ]
+    insert_rows(seeder, PORT_INSERT, rows)
+    length(rows)
 end
 
 function seed_carriers!(seeder::SurrealDBSeeder)
-    println("Seeding carriers...")
-    for carrier in CARRIERS
-        unionized = carrier["unionized"] ? "true" : "false"
-        sql = """
-        CREATE carrier:$(carrier["code"]) SET
-            code = '$(carrier["code"])',
-            name = '$(carrier["name"])',
-            carrier_type = '$(carrier["type"])',
-            country = country:$(carrier["country"]),
-            safety_rating = $(carrier["safety"]),
-            unionized = $unionized,
-            avg_wage_cents_hourly = $(carrier["wage"]),
-            avg_weekly_hours = $(carrier["hours"]),
-            sanctioned = false,
-            active = true;
-        """
-        query(seeder, sql)
-    end
-    println("  Created $(length(CARRIERS)) carriers")
+    rows = [
+        Dict{String, Any}(
+            "id" => carrier["code"],
+            "code" => carrier["code"],
+            "name" => carrier["name"],
+            "carrier_type" => carrier["type"],
+            "country" => carrier["country"],
+            "safety_rating" => carrier["safety"],
+            "unionized" => carrier["unionized"],
+            "avg_wage_cents_hourly" => carrier["wage"],
+            "avg_weekly_hours" => carrier["hours"],
+            "sanctioned" => false,
+            "active" => true,
+        )
+        for carrier in CARRIERS
+    ]
+    insert_rows(seeder, CARRIER_INSERT, rows)
+    length(rows)
 end
 
 function seed_transport_nodes!(seeder::SurrealDBSeeder)
-    println("Seeding transport nodes...")
-    for port in PORTS
-        modes_json = JSON3.write(port["modes"])
-        sql = """
-        CREATE transport_node:$(port["unlocode"]) SET
-            code = '$(port["unlocode"])',
-            port = port:$(port["unlocode"]),
-            node_type = 'HUB',
-            modes = $modes_json,
-            active = true;
-        """
-        query(seeder, sql)
-    end
-    println("  Created $(length(PORTS)) transport nodes")
+    rows = [
+        Dict{String, Any}(
+            "id" => port["unlocode"],
+            "code" => port["unlocode"],
+            "port" => port["unlocode"],
+            "node_type" => "HUB",
+            "modes" => port["modes"],
+            "active" => true,
+        )
+        for port in PORTS
+    ]
+    insert_rows(seeder, TRANSPORT_NODE_INSERT, rows)
+    length(rows)
 end
 
-function seed_transport_edges!(seeder::SurrealDBSeeder)
-    println("Seeding transport edges...")
-    carrier_map = Dict(c["code"] => c for c in CARRIERS)
-    edge_count = 0
-
-    for route in ROUTES
-        for carrier_code in route["carriers"]
-            edge = generate_edge(route, carrier_map[carrier_code])
-            sql = """
-            CREATE transport_edge SET
-                code = '$(edge["code"])',
-                from_node = transport_node:$(route["from"]),
-                to_node = transport_node:$(route["to"]),
-                carrier = carrier:$carrier_code,
-                mode = '$(edge["mode"])',
-                distance_km = $(edge["distance_km"]),
-                base_cost_usd = $(edge["base_cost_usd"]),
-                cost_per_kg_usd = $(edge["cost_per_kg_usd"]),
-                transit_hours = $(edge["transit_hours"]),
-                carbon_kg_per_tonne_km = $(edge["carbon_kg_per_tonne_km"]),
-                frequency = '$(edge["frequency"])',
-                active = true;
-            """
-            query(seeder, sql)
-            edge_count += 1
-        end
-    end
-
-    println("  Created $edge_count transport edges")
+function seed_transport_edges!(seeder::SurrealDBSeeder, rng::AbstractRNG=Random.default_rng())
+    rows = generate_edges(rng)
+    insert_rows(seeder, TRANSPORT_EDGE_INSERT, rows)
+    length(rows)
 end
 
 function seed_cargo_types!(seeder::SurrealDBSeeder)
-    println("Seeding cargo types...")
     cargo_types = [
         Dict("code" => "GEN", "name" => "General Cargo", "hazmat" => nothing, "temp" => false),
         Dict("code" => "REF", "name" => "Refrigerated", "hazmat" => nothing, "temp" => true, "min_c" => -25, "max_c" => 5),
@@ -311,34 +375,88 @@ function seed_cargo_types!(seeder::SurrealDBSeeder)
         Dict("code" => "HVY", "name" => "Heavy Machinery", "hazmat" => nothing, "temp" => false),
     ]
 
+    rows = Dict{String, Any}[]
     for ct in cargo_types
-        temp_fields = if get(ct, "temp", false)
-            ", temp_min_c = $(get(ct, "min_c", -20)), temp_max_c = $(get(ct, "max_c", 10))"
-        else
-            ""
+        # Absent keys select as NONE, so optional fields are left out rather than nulled.
+        row = Dict{String, Any}(
+            "id" => ct["code"],
+            "code" => ct["code"],
+            "name" => ct["name"],
+            "temp_controlled" => ct["temp"],
+        )
+        if !isnothing(ct["hazmat"])
+            row["hazmat_class"] = ct["hazmat"]
         end
-        hazmat = isnothing(ct["hazmat"]) ? "NONE" : "'$(ct["hazmat"])'"
-        temp_str = ct["temp"] ? "true" : "false"
-
-        sql = """
-        CREATE cargo_type:$(ct["code"]) SET
-            code = '$(ct["code"])',
-            name = '$(ct["name"])',
-            hazmat_class = $hazmat,
-            temp_controlled = $temp_str$temp_fields;
-        """
-        query(seeder, sql)
+        if get(ct, "temp", false)
+            row["temp_min_c"] = get(ct, "min_c", -20)
+            row["temp_max_c"] = get(ct, "max_c", 10)
+        end
+        push!(rows, row)
     end
-    println("  Created $(length(cargo_types)) cargo types")
+    insert_rows(seeder, CARGO_TYPE_INSERT, rows)
+    length(rows)
 end
 
-function seed_all!(seeder::SurrealDBSeeder)
-    seed_countries!(seeder)
-    seed_ports!(seeder)
-    seed_carriers!(seeder)
-    seed_cargo_types!(seeder)
-    seed_transport_nodes!(seeder)
-    seed_transport_edges!(seeder)
+const SEEDED_TABLES = ["country", "port", "carrier", "cargo_type", "transport_node", "transport_edge"]
+
+# Non-unique index definitions on the seeded tables, as (table, name, definition)
+function secondary_indexes(seeder::SurrealDBSeeder)
+    infos = execute(seeder, join(("INFO FOR TABLE $table;" for table in SEEDED_TABLES), "\n"))
+    [(table, string(name), "$definition;")
+     for (table, info) in zip(SEEDED_TABLES, infos)
+     for (name, definition) in pairs(info.result.indexes)
+     if !occursin(r"\bUNIQUE\b", definition)]
+end
+
+function rebuild_indexes(seeder::SurrealDBSeeder, definitions::Vector{String})
+    try
+        execute(seeder, join(definitions, "\n"))
+    catch
+        println("Warning: deferred indexes were not rebuilt; recreate them with:")
+        foreach(definition -> println("  ", definition), definitions)
+        rethrow()
+    end
+end
+
+function seed_all!(seeder::SurrealDBSeeder; rng::AbstractRNG=Random.default_rng(), defer_indexes::Bool=false)
+    # Opt-in, as live readers lose the indexes; read first, then drop in one transaction
+    deferred = String[]
+    if defer_indexes
+        indexes = secondary_indexes(seeder)
+        if !isempty(indexes)
+            removals = join(("REMOVE INDEX $name ON TABLE $table;" for (table, name, _) in indexes), "\n")
+            execute(seeder, "BEGIN TRANSACTION;\n$removals\nCOMMIT TRANSACTION;")
+            deferred = [definition for (_, _, definition) in indexes]
+        end
+    end
+
+    summary = try
+        # Reference tables are independent of each other; the network tables link to them.
+        reference = @sync [
+            "countries" => @async(seed_countries!(seeder)),
+            "ports" => @async(seed_ports!(seeder)),
+            "carriers" => @async(seed_carriers!(seeder)),
+            "cargo types" => @async(seed_cargo_types!(seeder)),
+        ]
+        network = @sync [
+            "transport nodes" => @async(seed_transport_nodes!(seeder)),
+            "transport edges" => @async(seed_transport_edges!(seeder, rng)),
+        ]
+        # Counts are reported in a fixed order once every task has finished.
+        ["Created $(fetch(task)) $label" for (label, task) in [reference; network]]
+    catch
+        # Surface the seeding error; a failed rebuild here is only logged.
+        if !isempty(deferred)
+            try
+                rebuild_indexes(seeder, deferred)
+            catch
+            end
+        end
+        rethrow()
+    end
+
+    isempty(deferred) || rebuild_indexes(seeder, deferred)
+    summary
 end
 
 # =============================================================================
@@ -360,31 +478,28 @@ function DragonflySeeder(url::String, password::Union{String, Nothing}=nothing)
 end
 
 function seed_constraints!(seeder::DragonflySeeder)
-    println("Seeding constraint cache in Dragonfly...")
-
     # Minimum wages by country
-    for (code, data) in COUNTRIES
-        Redis.set(seeder.conn, "constraint:min_wage:$code", string(data["min_wage_cents"]))
-    end
+    mapping = Dict{String, String}(
+        "constraint:min_wage:$code" => string(data["min_wage_cents"]) for (code, data) in COUNTRIES
+    )
 
-    # Maximum hours by region
+    # Maximum hours by region (strictest country in each region)
     regions = Dict{String, Int}()
-    for (code, data) in COUNTRIES
+    for data in values(COUNTRIES)
         region = data["region"]
-        if !haskey(regions, region) || data["max_hours"] < regions[region]
-            regions[region] = data["max_hours"]
-        end
+        regions[region] = min(get(regions, region, data["max_hours"]), data["max_hours"])
     end
-
     for (region, hours) in regions
-        Redis.set(seeder.conn, "constraint:max_hours:$region", string(hours))
+        mapping["constraint:max_hours:$region"] = string(hours)
     end
 
     # Default carbon budget
-    Redis.set(seeder.conn, "constraint:carbon_budget:default", "5000")
+    mapping["constraint:carbon_budget:default"] = "5000"
+
+    # Ship the whole constraint table in a single round trip
+    Redis.mset(seeder.conn, mapping)
 
-    println("  Set $(length(COUNTRIES)) wage constraints")
-    println("  Set $(length(regions)) hour constraints")
+    ["Set $(length(COUNTRIES)) wage constraints", "Set $(length(regions)) hour constraints"]
 end
 
 function seed_all!(seeder::DragonflySeeder)
@@ -395,6 +510,9 @@ end
 # MAIN
 # =============================================================================
 
+# Fixed default so repeated runs produce identical edge data
+const DEFAULT_SEED = Int(0x7ed5)
+
 function parse_commandline()
     s = ArgParseSettings(description="Seed VEDS with synthetic data")
 
@@ -414,11 +532,35 @@ function parse_commandline()
         "--dragonfly-pass"
             help = "Dragonfly password"
             default = nothing
+        "--seed"
+            help = "Random seed for generated edge costs and transit times"
+            arg_type = Int
+            default = DEFAULT_SEED
+        "--defer-indexes"
+            help = "Drop non-unique SurrealDB indexes during the load and rebuild them afterwards"
+            action = :store_true
     end
 
     parse_args(s)
 end
 
+# Failures inside @sync/@async arrive wrapped in task and composite exceptions
+root_cause(e::TaskFailedException) = root_cause(e.task.exception)
+root_cause(e::CompositeException) = root_cause(first(e.exceptions))
+root_cause(e) = e
+
+function report(service::String, task::Task, hint::String)
+    println("Seeding $service...")
+    try
+        for line in fetch(task)
+            println("  ", line)
+        end
+    catch e
+        println("Warning: $service seeding failed: $(sprint(showerror, root_cause(e)))")
+        println(hint)
+    end
+end
+
 function main()
     args = parse_commandline()
 
@@ -427,24 +569,16 @@ function main()
     println("=" ^ 60)
     println()
 
-    println("Seeding SurrealDB...")
-    surreal = SurrealDBSeeder(args["surrealdb-url"], args["surrealdb-user"], args["surrealdb-pass"])
-    try
-        seed_all!(surreal)
-    catch e
-        println("Warning: SurrealDB seeding failed: $e")
-        println("Make sure SurrealDB is running and the schema is loaded.")
+    # SurrealDB and Dragonfly are independent services, so seed them concurrently
+    surreal = @async begin
+        seeder = SurrealDBSeeder(args["surrealdb-url"], args["surrealdb-user"], args["surrealdb-pass"])
+        seed_all!(seeder; rng=Xoshiro(args["seed"]), defer_indexes=args["defer-indexes"])
     end
+    dragonfly = @async seed_all!(DragonflySeeder(args["dragonfly-url"], args["dragonfly-pass"]))
 
+    report("SurrealDB", surreal, "Make sure SurrealDB is running and the schema is loaded.")
     println()
-    println("Seeding Dragonfly...")
-    try
-        dragonfly = DragonflySeeder(args["dragonfly-url"], args["dragonfly-pass"])
-        seed_all!(dragonfly)
-    catch e
-        println("Warning: Dragonfly seeding failed: $e")
-        println("Make sure Dragonfly is running.")
-    end
+    report("Dragonfly", dragonfly, "Make sure Dragonfly is running.")
 
     println()
     println("=" ^ 60)